@@ -128,9 +128,8 @@ class Cluster:
         neighbors = int(scale * len(self.data))  # 0.05 default
         if neighbors < 2:
             neighbors = 2
-        test_data = self.data[:, :3].copy()
         neigh = LocalOutlierFactor(n_neighbors=neighbors)
-        result = neigh.fit_predict(test_data)
+        result = neigh.fit_predict(self.data[:, :3])  # does not modify the data
         self.data = self.data[result > 0]  # label=-1 is an outlier
 
     def create_splines(self, smoothing: float = 1.0) -> None:
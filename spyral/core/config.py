@@ -190,6 +190,9 @@ class ClusterParameters:
     outlier_scale_factor: float
         Factor which is multiplied by the number of points in a trajectory to set the number of neighbors parameter
         for scikit-learns LocalOutlierFactor test
+    n_workers: int
+        The number of worker processes used to cluster the events of a run. 1 means events
+        are clustered in the run's own process
     """
 
     min_cloud_size: int = 0
@@ -200,6 +203,7 @@ class ClusterParameters:
     circle_overlap_ratio: float = 0.0
     fractional_charge_threshold: float = 0.0
     outlier_scale_factor: float = 0.0
+    n_workers: int = 1
 
 
 @dataclass
@@ -378,6 +382,7 @@ def deserialize_config(json_data: dict[Any, Any]) -> Config:
         "fractional_charge_threshold"
     ]
     config.cluster.outlier_scale_factor = cluster_params["outlier_scale_factor"]
+    config.cluster.n_workers = cluster_params["n_workers"]
 
     est_params = json_data["Estimate"]
     config.estimate.min_total_trajectory_points = est_params[
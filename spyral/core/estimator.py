@@ -191,8 +191,8 @@ def estimate_physics_pass(
     direction = chosen_direction
     vertex = np.array([0.0, 0.0, 0.0])  # reaction vertex
     center = np.array([0.0, 0.0, 0.0])  # spiral center
-    # copy the data so we can modify it without worrying about side-effects
-    cluster_data = cluster.data.copy()
+    # The data is only read (flipping makes a view), so no copy is needed
+    cluster_data = cluster.data
 
     # If chosen direction is set to NONE, we want to have the algorithm
     # try to decide which direction the trajectory is going
@@ -0,0 +1,405 @@
+"""Storage of ragged per-event data in hdf5 files
+
+Event data like point clouds and clusters vary in length from entry to entry. Rather
+than making one dataset or group (and a set of attributes) per entry, the data of every entry is
+concatenated into a single 2-D dataset named "cloud". The extent of each entry is
+recorded in the 1-D datasets "offset" and "length", and any per-entry scalar values
+(event number, ion chamber values, etc.) are stored as 1-D datasets alongside. This is
+a struct-of-arrays layout: the number of hdf5 objects in a file no longer scales with
+the number of events. Point cloud files have one entry per event, cluster files have one
+entry per cluster.
+
+Entry data is stored in single precision, which is far more than the resolution of the
+detector, halving the number of bytes written and read. It is always float64 in memory;
+the conversion is done by hdf5 as the data is read.
+
+Attributes
+----------
+STORAGE_DTYPE: type
+    The dtype of the "cloud" dataset in the file (float32)
+CHUNK_BYTES: int
+    The target size of a chunk of the "cloud" dataset in bytes (1 MB)
+ENTRIES_PER_BATCH: int
+    The number of entries staged in memory before they are written to the file
+CHUNK_CACHE_BYTES: int
+    The size of the hdf5 chunk cache to use when opening a store file for reading or
+    writing (64 MB). Many compressed chunks are kept decompressed in memory, so reading
+    the entries of a chunk one at a time does not decompress the chunk for every entry
+CHUNK_CACHE_SLOTS: int
+    The number of hash slots of the hdf5 chunk cache, a prime well above the number
+    of chunks which fit in the cache
+CHUNK_CACHE_W0: float
+    The hdf5 chunk cache preemption policy. Stores are written and read in entry order,
+    so chunks which have been fully read or written are evicted first (1.0)
+POINT_CLOUD_FIELDS: dict[str, type]
+    The per-event values stored with the point clouds
+CLUSTER_FIELDS: dict[str, type]
+    The per-cluster values stored with the clusters
+"""
+
+import h5py as h5
+import numpy as np
+from typing import Iterator
+
+STORAGE_DTYPE: type = np.float32
+CHUNK_BYTES: int = 1024 * 1024
+ENTRIES_PER_BATCH: int = 1000
+CHUNK_CACHE_BYTES: int = 64 * 1024 * 1024
+CHUNK_CACHE_SLOTS: int = 5003
+CHUNK_CACHE_W0: float = 1.0
+
+POINT_CLOUD_FIELDS: dict[str, type] = {
+    "event": np.int64,
+    "ic_amplitude": np.float64,
+    "ic_integral": np.float64,
+    "ic_centroid": np.float64,
+    "ic_multiplicity": np.float64,
+}
+
+CLUSTER_FIELDS: dict[str, type] = {
+    "event": np.int64,
+    "cluster_index": np.int64,
+    "label": np.int64,
+    "ic_amplitude": np.float64,
+    "ic_integral": np.float64,
+    "ic_centroid": np.float64,
+    "ic_multiplicity": np.float64,
+}
+
+
+class EventStoreWriter:
+    """Buffered writer of ragged per-event data to an hdf5 group
+
+    Entries are staged in memory and written to the file in batches, so that each
+    dataset recieves a single write per batch rather than one write per entry.
+    Data is only guaranteed to be in the file once flush() has been called.
+
+    All datasets are chunked and compressed with the byte shuffle and lzf filters
+    which ship with h5py, so no plugins are needed to read the files back.
+
+    Attributes
+    ----------
+    data: h5py.Dataset
+        The concatenated entry data
+    fields: dict[str, h5py.Dataset]
+        The per-entry scalar datasets, including offset and length
+    batch_size: int
+        The number of entries staged before a write
+
+    Methods
+    -------
+    EventStoreWriter(group: h5py.Group, n_columns: int, fields: dict[str, type], batch_size: int = ENTRIES_PER_BATCH)
+        Create the datasets and the writer
+    append(data: ndarray, **values)
+        Stage an entry for writing
+    extend(data: list[ndarray], **values)
+        Stage many entries for writing at once
+    flush()
+        Write all staged entries to the file
+    """
+
+    def __init__(
+        self,
+        group: h5.Group,
+        n_columns: int,
+        fields: dict[str, type],
+        batch_size: int = ENTRIES_PER_BATCH,
+    ):
+        """Create the datasets and the writer
+
+        Parameters
+        ----------
+        group: h5py.Group
+            The group in which the datasets are created
+        n_columns: int
+            The number of columns in each entry (i.e. 8 for a point cloud, 5 for a cluster)
+        fields: dict[str, type]
+            The names and dtypes of the per-entry scalar values
+        batch_size: int
+            The number of entries staged before a write (default ENTRIES_PER_BATCH)
+
+        Returns
+        -------
+        EventStoreWriter
+            An instance of the class
+        """
+        self.batch_size = batch_size
+        chunk_rows = max(
+            1, CHUNK_BYTES // (n_columns * np.dtype(STORAGE_DTYPE).itemsize)
+        )
+        self.data: h5.Dataset = group.create_dataset(
+            "cloud",
+            shape=(0, n_columns),
+            maxshape=(None, n_columns),
+            chunks=(chunk_rows, n_columns),
+            dtype=STORAGE_DTYPE,
+            shuffle=True,
+            compression="lzf",
+        )
+        self.fields: dict[str, h5.Dataset] = {}
+        self.staged_values: dict[str, np.ndarray] = {}
+        for name, dtype in {"offset": np.int64, "length": np.int64, **fields}.items():
+            self.fields[name] = group.create_dataset(
+                name,
+                shape=(0,),
+                maxshape=(None,),
+                chunks=(batch_size,),
+                dtype=dtype,
+                shuffle=True,
+                compression="lzf",
+            )
+            self.staged_values[name] = np.zeros(batch_size, dtype=dtype)
+        self.staged_data: list[np.ndarray] = []
+        self.n_staged = 0
+        self.n_rows = 0
+
+    def append(self, data: np.ndarray, **values):
+        """Stage an entry for writing
+
+        Every field given at construction must be given a value. If the
+        staging area is full, the batch is written to the file.
+
+        Parameters
+        ----------
+        data: ndarray
+            The entry data, with shape (N, n_columns)
+        **values
+            The per-entry scalar values, keyed by field name
+        """
+        self.staged_values["offset"][self.n_staged] = self.n_rows
+        self.staged_values["length"][self.n_staged] = len(data)
+        for name, value in values.items():
+            self.staged_values[name][self.n_staged] = value
+        self.staged_data.append(data)
+        self.n_rows += len(data)
+        self.n_staged += 1
+        if self.n_staged == self.batch_size:
+            self.flush()
+
+    def extend(self, data: list[np.ndarray], **values):
+        """Stage many entries for writing at once
+
+        Used when an event produces several entries (i.e. the clusters of an event), so that
+        they are staged with a few array operations rather than one call per entry. Every
+        field given at construction must be given a value. If the staging area fills,
+        the batch is written to the file.
+
+        Parameters
+        ----------
+        data: list[ndarray]
+            The data of each entry, each with shape (N, n_columns)
+        **values
+            The per-entry scalar values, keyed by field name. Either a sequence with one value
+            per entry or a single value shared by all of the entries
+        """
+        n_entries = len(data)
+        first = 0
+        while first < n_entries:
+            n_batch = min(n_entries - first, self.batch_size - self.n_staged)
+            last = first + n_batch
+            staged = np.s_[self.n_staged : self.n_staged + n_batch]
+            lengths = np.array([len(entry) for entry in data[first:last]])
+            ends = np.cumsum(lengths)
+            self.staged_values["offset"][staged] = self.n_rows + ends - lengths
+            self.staged_values["length"][staged] = lengths
+            for name, value in values.items():
+                if np.ndim(value) == 0:
+                    self.staged_values[name][staged] = value
+                else:
+                    self.staged_values[name][staged] = value[first:last]
+            self.staged_data.extend(data[first:last])
+            self.n_rows += int(ends[-1])
+            self.n_staged += n_batch
+            first = last
+            if self.n_staged == self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """Write all staged entries to the file"""
+        if self.n_staged == 0:
+            return
+
+        block = np.concatenate(self.staged_data, axis=0, dtype=STORAGE_DTYPE)
+        row_start = self.data.shape[0]
+        if len(block) > 0:
+            self.data.resize(row_start + len(block), axis=0)
+            self.data.write_direct(
+                block, dest_sel=np.s_[row_start : row_start + len(block)]
+            )
+
+        entry_start = self.fields["offset"].shape[0]
+        entry_stop = entry_start + self.n_staged
+        for name, dataset in self.fields.items():
+            dataset.resize(entry_stop, axis=0)
+            dataset.write_direct(
+                self.staged_values[name],
+                source_sel=np.s_[: self.n_staged],
+                dest_sel=np.s_[entry_start:entry_stop],
+            )
+
+        self.staged_data.clear()
+        self.n_staged = 0
+
+
+class EventStoreReader:
+    """Batched reader of ragged per-event data from an hdf5 group
+
+    The per-entry values are small and are loaded into memory at construction. Entry data
+    is read in contiguous blocks of many entries, so that the file is read with a single
+    call per batch rather than once per entry.
+
+    Attributes
+    ----------
+    data: h5py.Dataset
+        The concatenated entry data
+    fields: dict[str, ndarray]
+        The per-entry scalar values, including offset and length
+
+    Methods
+    -------
+    EventStoreReader(group: h5py.Group)
+        Load the per-entry values and create the reader
+    read(index: int) -> ndarray
+        Read the data of a single entry
+    read_into(index: int, buffer: ndarray) -> ndarray
+        Read the data of a single entry into an existing buffer
+    read_batch(first: int, last: int) -> list[ndarray]
+        Read the data of a contiguous range of entries with a single read
+    iter_batches(batch_size: int = ENTRIES_PER_BATCH) -> Iterator[tuple[range, list[ndarray]]]
+        Iterate over all entries in batches, reading each batch with a single read
+    iter_entries(batch_size: int = ENTRIES_PER_BATCH) -> Iterator[tuple[int, ndarray]]
+        Iterate over all entries, reading the data in batches
+    """
+
+    def __init__(self, group: h5.Group):
+        """Load the per-entry values and create the reader
+
+        Parameters
+        ----------
+        group: h5py.Group
+            The group containing the datasets written by an EventStoreWriter
+
+        Returns
+        -------
+        EventStoreReader
+            An instance of the class
+        """
+        self.data: h5.Dataset = group["cloud"]  # type: ignore
+        self.fields: dict[str, np.ndarray] = {
+            name: dataset[:]  # type: ignore
+            for name, dataset in group.items()
+            if name != "cloud"
+        }
+
+    def __len__(self) -> int:
+        return len(self.fields["offset"])
+
+    def read(self, index: int) -> np.ndarray:
+        """Read the data of a single entry
+
+        Parameters
+        ----------
+        index: int
+            The entry index (not the event number)
+
+        Returns
+        -------
+        ndarray
+            The entry data
+        """
+        buffer = np.empty((self.fields["length"][index], self.data.shape[1]))
+        return self.read_into(index, buffer)
+
+    def read_into(self, index: int, buffer: np.ndarray) -> np.ndarray:
+        """Read the data of a single entry into an existing buffer
+
+        Allows a single buffer to be reused across many reads.
+
+        Parameters
+        ----------
+        index: int
+            The entry index (not the event number)
+        buffer: ndarray
+            The float64 buffer, which must have at least as many rows as the entry
+
+        Returns
+        -------
+        ndarray
+            The entry data, a view of the buffer
+        """
+        start = self.fields["offset"][index]
+        length = self.fields["length"][index]
+        if length > 0:
+            self.data.read_direct(
+                buffer,
+                source_sel=np.s_[start : start + length],
+                dest_sel=np.s_[:length],
+            )
+        return buffer[:length]
+
+    def read_batch(self, first: int, last: int) -> list[np.ndarray]:
+        """Read the data of a contiguous range of entries with a single read
+
+        The entries are read into a fresh buffer; the returned data are views of
+        that buffer.
+
+        Parameters
+        ----------
+        first: int
+            The first entry index
+        last: int
+            The last entry index, exclusive
+
+        Returns
+        -------
+        list[ndarray]
+            The data of each entry in the range
+        """
+        offsets = self.fields["offset"]
+        lengths = self.fields["length"]
+        start = offsets[first]
+        stop = offsets[last - 1] + lengths[last - 1]
+        buffer = np.empty((stop - start, self.data.shape[1]))
+        if stop > start:
+            self.data.read_direct(buffer, source_sel=np.s_[start:stop])
+        return [
+            buffer[offsets[index] - start : offsets[index] - start + lengths[index]]
+            for index in range(first, last)
+        ]
+
+    def iter_batches(
+        self, batch_size: int = ENTRIES_PER_BATCH
+    ) -> Iterator[tuple[range, list[np.ndarray]]]:
+        """Iterate over all entries in batches, reading each batch with a single read
+
+        Parameters
+        ----------
+        batch_size: int
+            The number of entries read per call to the file (default ENTRIES_PER_BATCH)
+
+        Yields
+        ------
+        tuple[range, list[ndarray]]
+            The entry indices of the batch and the data of each entry
+        """
+        for first in range(0, len(self), batch_size):
+            last = min(first + batch_size, len(self))
+            yield range(first, last), self.read_batch(first, last)
+
+    def iter_entries(
+        self, batch_size: int = ENTRIES_PER_BATCH
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        """Iterate over all entries, reading the data in batches
+
+        Parameters
+        ----------
+        batch_size: int
+            The number of entries read per call to the file (default ENTRIES_PER_BATCH)
+
+        Yields
+        ------
+        tuple[int, ndarray]
+            The entry index and the entry data
+        """
+        for indices, batch in self.iter_batches(batch_size):
+            yield from zip(indices, batch)
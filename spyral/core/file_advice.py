@@ -0,0 +1,76 @@
+"""Hints to the operating system about how an hdf5 file will be accessed
+
+Uses posix_fadvise on the file descriptor underlying an h5py File, so that the kernel
+page cache can be managed for the access pattern of the phase (i.e. aggressive read-ahead
+for a file read once from front to back). The advice is only a hint: on platforms without
+posix_fadvise (Windows, MacOS) or for files which are not opened with the default (sec2)
+driver these functions do nothing.
+"""
+
+import h5py as h5
+import os
+
+
+def _advise(file: h5.File, advice: int, offset: int = 0, length: int = 0):
+    if not hasattr(os, "posix_fadvise") or file.driver != "sec2":
+        return
+    try:
+        fd = file.id.get_vfd_handle()
+        os.posix_fadvise(fd, offset, length, advice)  # type: ignore
+    except (OSError, ValueError):
+        return
+
+
+def advise_sequential(file: h5.File):
+    """Advise the kernel that a file will be read sequentially
+
+    The kernel increases the read-ahead for the file, which helps when
+    the file is read once from front to back, even if hdf5 reads it in small pieces.
+
+    Parameters
+    ----------
+    file: h5py.File
+        The file to be read
+    """
+    if hasattr(os, "POSIX_FADV_SEQUENTIAL"):
+        _advise(file, os.POSIX_FADV_SEQUENTIAL)
+
+
+def advise_done(file: h5.File):
+    """Advise the kernel that the data of a file will not be needed again
+
+    The kernel drops the (clean) pages of the file from the page cache, leaving the memory
+    for files which will be needed, like the output of the phase.
+
+    Parameters
+    ----------
+    file: h5py.File
+        The file which is no longer needed
+    """
+    if hasattr(os, "POSIX_FADV_DONTNEED"):
+        _advise(file, os.POSIX_FADV_DONTNEED)
+
+
+def advise_will_need(dataset: h5.Dataset):
+    """Advise the kernel that the data of a dataset will be read soon
+
+    The kernel starts reading the bytes of the dataset into the page cache in the
+    background and returns immediately, so that the read can overlap with other work
+    (i.e. the analysis of the previous event). Works for both contiguous and chunked
+    datasets; datasets with no storage allocated are ignored.
+
+    Parameters
+    ----------
+    dataset: h5py.Dataset
+        The dataset which will be read
+    """
+    if not hasattr(os, "POSIX_FADV_WILLNEED"):
+        return
+    dsid = dataset.id
+    offset = dsid.get_offset()
+    if offset is not None:
+        _advise(dataset.file, os.POSIX_FADV_WILLNEED, offset, dsid.get_storage_size())
+    elif dataset.chunks is not None:
+        for chunk in range(dsid.get_num_chunks()):
+            info = dsid.get_chunk_info(chunk)
+            _advise(dataset.file, os.POSIX_FADV_WILLNEED, info.byte_offset, info.size)
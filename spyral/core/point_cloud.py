@@ -1,4 +1,4 @@
-from .pad_map import PadMap
+from .pad_map import PadMap, PadData
 from .constants import INVALID_EVENT_NUMBER
 from ..correction import ElectronCorrector
 from ..trace.get_event import GetEvent
@@ -71,11 +71,13 @@ class PointCloud:
             The PadMap used to get pad correction values
         """
         self.event_number = event.number
-        count = 0
-        for trace in event.traces:
-            count += trace.get_number_of_peaks()
-        self.cloud = np.zeros((count, 8))
-        idx = 0
+        # Gather the pad and peak values of every point, then fill the cloud column by column
+        pads: list[PadData] = []
+        pad_ids: list[int] = []
+        n_peaks: list[int] = []
+        centroids: list[float] = []
+        amplitudes: list[float] = []
+        integrals: list[float] = []
         for trace in event.traces:
             if trace.get_number_of_peaks() == 0 or trace.get_number_of_peaks() > 5:
                 continue
@@ -96,20 +98,36 @@ class PointCloud:
             pad = pmap.get_pad_data(check)
             if pad is None or pmap.is_beam_pad(check):
                 continue
+            pads.append(pad)
+            pad_ids.append(trace.hw_id.pad_id)
+            n_peaks.append(trace.get_number_of_peaks())
             for peak in trace.get_peaks():
-                self.cloud[idx, 0] = pad.x  # X-coordinate, geometry
-                self.cloud[idx, 1] = pad.y  # Y-coordinate, geometry
-                self.cloud[idx, 2] = (
-                    peak.centroid + pad.time_offset
-                )  # Z-coordinate, time with correction until calibrated with calibrate_z_position()
-                self.cloud[idx, 3] = peak.amplitude
-                self.cloud[idx, 4] = peak.integral * pad.gain
-                self.cloud[idx, 5] = trace.hw_id.pad_id
-                self.cloud[idx, 6] = (
-                    peak.centroid + pad.time_offset
-                )  # Time bucket with correction
-                self.cloud[idx, 7] = pad.scale
-                idx += 1
+                centroids.append(peak.centroid)
+                amplitudes.append(peak.amplitude)
+                integrals.append(peak.integral)
+
+        # One row per point: [x, y, time_offset, gain, scale]
+        pad_values = np.repeat(
+            np.array(
+                [(pad.x, pad.y, pad.time_offset, pad.gain, pad.scale) for pad in pads],
+                dtype=np.float64,
+            ).reshape(-1, 5),
+            n_peaks,
+            axis=0,
+        )
+        # Time bucket with correction
+        time = np.array(centroids, dtype=np.float64) + pad_values[:, 2]
+
+        self.cloud = np.empty((len(time), 8))
+        self.cloud[:, 0] = pad_values[:, 0]  # X-coordinate, geometry
+        self.cloud[:, 1] = pad_values[:, 1]  # Y-coordinate, geometry
+        # Z-coordinate, time with correction until calibrated with calibrate_z_position()
+        self.cloud[:, 2] = time
+        self.cloud[:, 3] = amplitudes
+        self.cloud[:, 4] = np.array(integrals, dtype=np.float64) * pad_values[:, 3]
+        self.cloud[:, 5] = np.repeat(pad_ids, n_peaks)
+        self.cloud[:, 6] = time
+        self.cloud[:, 7] = pad_values[:, 4]
         self.cloud = self.cloud[self.cloud[:, 3] != 0.0]
 
     def load_cloud_from_hdf5_data(self, data: np.ndarray, event_number: int):
@@ -173,14 +191,13 @@ class PointCloud:
             The ion chamber time correction in GET Time Buckets
         """
         # Maybe use mm as the reference because it is more stable?
-        for idx, point in enumerate(self.cloud):
-            self.cloud[idx][2] = (
-                (window_tb - (point[6] - ic_correction))
-                / (window_tb - micromegas_tb)
-                * detector_length
-            )
-            if efield_correction is not None:
-                self.cloud[idx] = efield_correction.correct_point(self.cloud[idx])
+        self.cloud[:, 2] = (
+            (window_tb - (self.cloud[:, 6] - ic_correction))
+            / (window_tb - micromegas_tb)
+            * detector_length
+        )
+        if efield_correction is not None:
+            self.cloud = efield_correction.correct_cloud(self.cloud)
 
     def remove_illegal_points(self, detector_length: float = 1000.0):
         """Remove any points which lie outside the legal detector bounds in z
@@ -1,6 +1,42 @@
 from ..interpolate import BilinearInterpolator, clamp
 from pathlib import Path
 import numpy as np
+from numba import njit
+
+
+@njit
+def apply_correction(correction: BilinearInterpolator, cloud: np.ndarray) -> np.ndarray:
+    """Jit-ed application of the electron drift correction to every point in a point cloud
+
+    Parameters
+    ----------
+    correction: BilinearInterpolator
+        The correction interpolator, which returns [rho_cor, trans_cor, z_cor]
+    cloud: ndarray
+        The point cloud to be corrected
+
+    Returns
+    -------
+    ndarray
+        The corrected point cloud
+    """
+    corrected = cloud.copy()
+    values = np.empty(correction.values.shape[2])
+    for idx in range(len(cloud)):
+        radius = np.sqrt(cloud[idx, 0] ** 2.0 + cloud[idx, 1] ** 2.0)
+        azimuthal = np.arctan2(cloud[idx, 1], cloud[idx, 0])
+
+        correction.interpolate_into(radius, cloud[idx, 2], values)
+
+        z_correction = clamp(values[2], 0.0, 1000.0)
+
+        corrected_radius = np.sqrt((radius + values[0]) ** 2.0 + values[1] ** 2.0)
+        corrected_azim = azimuthal + np.arctan2(values[1], (radius + values[0]))
+
+        corrected[idx, 0] = corrected_radius * np.cos(corrected_azim)
+        corrected[idx, 1] = corrected_radius * np.sin(corrected_azim)
+        corrected[idx, 2] = cloud[idx, 2] - z_correction
+    return corrected
 
 
 class ElectronCorrector:
@@ -19,6 +55,8 @@ class ElectronCorrector:
         Construct the corrector
     correct_point(point: ndarray) -> ndarray
         Apply the correction to a point in a point cloud
+    correct_cloud(cloud: ndarray) -> ndarray
+        Apply the correction to every point in a point cloud
 
     """
 
@@ -72,6 +110,23 @@ class ElectronCorrector:
 
         return corrected_point
 
+    def correct_cloud(self, cloud: np.ndarray) -> np.ndarray:
+        """Apply the correction to every point in a point cloud
+
+        Equivalent to calling correct_point on each point, but done in a single JIT-ed loop
+
+        Parameters
+        ----------
+        cloud: ndarray
+            The point cloud to be corrected
+
+        Returns
+        -------
+        ndarray
+            The corrected point cloud
+        """
+        return apply_correction(self.correction, cloud)
+
 
 def create_electron_corrector(ecorr_path: Path) -> ElectronCorrector:
     """Create an ElectronCorrector
@@ -0,0 +1,46 @@
+import numpy as np
+from numba import njit
+
+
+@njit
+def points_in_polygon(x: np.ndarray, y: np.ndarray, vertices: np.ndarray) -> np.ndarray:
+    """Jit-ed test of which points lie inside of a polygon
+
+    Uses the crossing number (even-odd) test: a ray cast from a point crosses the edges of the polygon an
+    odd number of times if and only if the point is inside of the polygon. Points which lie exactly on an
+    edge may be considered either inside or outside.
+
+    Parameters
+    ----------
+    x: ndarray
+        The x-coordinates of the points to be tested
+    y: ndarray
+        The y-coordinates of the points to be tested
+    vertices: ndarray
+        A Nx2 array of the polygon vertices, where the first column is the x-coordinate and the second column is
+        the y-coordinate. The polygon may be open or closed (first vertex repeated at the end).
+
+    Returns
+    -------
+    ndarray
+        A boolean array with the same length as x, True where the point is inside of the polygon
+    """
+    inside = np.zeros(len(x), dtype=np.bool_)
+    n_vertices = len(vertices)
+    for idx in range(len(x)):
+        px = x[idx]
+        py = y[idx]
+        result = False
+        prev = n_vertices - 1
+        for curr in range(n_vertices):
+            x_curr = vertices[curr, 0]
+            y_curr = vertices[curr, 1]
+            x_prev = vertices[prev, 0]
+            y_prev = vertices[prev, 1]
+            if (y_curr > py) != (y_prev > py):
+                x_cross = x_curr + (py - y_curr) * (x_prev - x_curr) / (y_prev - y_curr)
+                if px < x_cross:
+                    result = not result
+            prev = curr
+        inside[idx] = result
+    return inside
@@ -86,6 +86,8 @@ class BilinearInterpolator:
         Internal consistency check of the grid. Raises an Exception if check fails.
     interpolate(x: float, y: float) -> np.ndarray
         Interpolate on a given coordinate (x,y)
+    interpolate_into(x: float, y: float, out: np.ndarray)
+        Interpolate on a given coordinate (x,y), writing the value into an existing array
     """
 
     def __init__(
@@ -219,35 +221,64 @@ class BilinearInterpolator:
             this can contain NaN values. Otherwise the requests
             are clamped to the edge of the grid
         """
+        result = np.empty(self.values.shape[2])
+        self.interpolate_into(x, y, result)
+        return result
+
+    def interpolate_into(self, x: float, y: float, out: np.ndarray):
+        """Interpolate on a given coordinate (x,y), writing the value into an existing array
+
+        The value is computed element by element, so no temporary arrays are allocated. Use this
+        when interpolating many times, i.e. once per time step of a trajectory.
+
+        Parameters
+        ----------
+        x: float
+            The x-coordinate of the point to interpolate
+        y: float
+            The y-coordinate of the point to interpolate
+        out: ndarray
+            The array the interpolated value is written to, with length equal to the last dimension
+            of the grid. If the extrapolation policy was set to NaN, this can be filled with NaN
+            values. Otherwise the requests are clamped to the edge of the grid
+        """
         if self.nan and (
             x > self.x_max or x < self.x_min or y < self.y_min or y > self.y_max
         ):
-            return np.full(self.values.shape[2], np.nan)
+            out[:] = np.nan
+            return
 
         x = clamp(x, self.x_min, self.x_max)
         y = clamp(y, self.y_min, self.y_max)
         x1_bin, x1, x2_bin, x2 = self.get_edges_x(x)
         y1_bin, y1, y2_bin, y2 = self.get_edges_y(y)
 
-        q11 = self.values[x1_bin, y1_bin]
-        q12 = self.values[x1_bin, y2_bin]
-        q21 = self.values[x2_bin, y1_bin]
-        q22 = self.values[x2_bin, y2_bin]
+        values = self.values
         x2x = x2 - x
         y2y = y2 - y
         xx1 = x - x1
         yy1 = y - y1
 
         if x2 == x1 and y1 == y2:  # On a corner
-            return q11
+            for idx in range(len(out)):
+                out[idx] = values[x1_bin, y1_bin, idx]
         elif x2 == x1:  # At xlim
-            return (q11 * yy1 + q12 * y2y) / (y2 - y1)
+            for idx in range(len(out)):
+                out[idx] = (
+                    values[x1_bin, y1_bin, idx] * yy1
+                    + values[x1_bin, y2_bin, idx] * y2y
+                ) / (y2 - y1)
         elif y1 == y2:  # At ylim
-            return (q11 * xx1 + q21 * x2x) / (x1 - x2)
+            for idx in range(len(out)):
+                out[idx] = (
+                    values[x1_bin, y1_bin, idx] * xx1
+                    + values[x2_bin, y1_bin, idx] * x2x
+                ) / (x1 - x2)
         else:  # In a cell
-            return (
-                q11 * (x2x) * (y2y)
-                + q21 * (xx1) * (y2y)
-                + q12 * (x2x) * (yy1)
-                + q22 * (xx1) * (yy1)
-            ) / ((x2 - x1) * (y2 - y1))
+            for idx in range(len(out)):
+                out[idx] = (
+                    values[x1_bin, y1_bin, idx] * (x2x) * (y2y)
+                    + values[x2_bin, y1_bin, idx] * (xx1) * (y2y)
+                    + values[x1_bin, y2_bin, idx] * (x2x) * (yy1)
+                    + values[x2_bin, y2_bin, idx] * (xx1) * (yy1)
+                ) / ((x2 - x1) * (y2 - y1))
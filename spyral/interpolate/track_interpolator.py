@@ -235,30 +235,35 @@ class TrackInterpolator:
             Returns a Nx3 ndarray of the trajectory data or None when the algorithm fails
         """
 
+        # This is called for every evaluation of the objective function in a fit, so the
+        # trajectory is built in place without any temporary arrays
         trajectory = np.zeros((len(self.interpolators), 3))
-        for idx, _ in enumerate(trajectory):
-            trajectory[idx] = self.interpolators[idx].interpolate(polar, ke)
+        for idx in range(len(trajectory)):
+            self.interpolators[idx].interpolate_into(polar, ke, trajectory[idx])
 
-        # Rotate the trajectory in azimuthal (around z) to match data
-        z_rot = np.array(
-            [
-                [np.cos(azim), -np.sin(azim), 0.0],
-                [np.sin(azim), np.cos(azim), 0.0],
-                [0.0, 0.0, 1.0],
-            ]
-        )
-        trajectory = (z_rot @ trajectory.T).T
-        # Translate to vertex
-        trajectory[:, 0] += vx
-        trajectory[:, 1] += vy
-        trajectory[:, 2] += vz
-        # Trim stopped region
+        # Rotate the trajectory in azimuthal (around z) to match data and translate to vertex
+        # Trim stopped region (repeated points)
+        cos_azim = np.cos(azim)
+        sin_azim = np.sin(azim)
         removal = np.full(len(trajectory), True)
-        previous_element = np.full(3, -1.0)
-        for idx, element in enumerate(trajectory):
-            if np.all(previous_element[:] == element[:]):
+        prev_x = -1.0
+        prev_y = -1.0
+        prev_z = -1.0
+        for idx in range(len(trajectory)):
+            x = trajectory[idx, 0]
+            y = trajectory[idx, 1]
+            trajectory[idx, 0] = cos_azim * x - sin_azim * y + vx
+            trajectory[idx, 1] = sin_azim * x + cos_azim * y + vy
+            trajectory[idx, 2] += vz
+            if (
+                trajectory[idx, 0] == prev_x
+                and trajectory[idx, 1] == prev_y
+                and trajectory[idx, 2] == prev_z
+            ):
                 removal[idx] = False
-            previous_element = element
+            prev_x = trajectory[idx, 0]
+            prev_y = trajectory[idx, 1]
+            prev_z = trajectory[idx, 2]
 
         trajectory = trajectory[removal]
         if len(trajectory) < 2:
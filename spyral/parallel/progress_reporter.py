@@ -0,0 +1,96 @@
+from .status_message import StatusMessage, Phase
+
+from multiprocessing import SimpleQueue
+from threading import Thread, Event
+
+REPORT_INTERVAL: float = 0.1  # seconds
+
+
+class ProgressReporter:
+    """Reports the progress of a phase to the parent process from a background thread
+
+    The phase loop only records how many items have been processed by assigning the count attribute
+    (a single store, which is atomic under the GIL). A daemon thread wakes up every REPORT_INTERVAL seconds
+    and sends any new progress to the parent through the queue. This keeps the printing/pickling/pipe writes
+    out of the loop. Use as a context manager; the remaining progress is sent on exit.
+
+    Attributes
+    ----------
+    queue: SimpleQueue
+        Communication channel back to the parent process
+    run: int
+        Run number being processed
+    phase: Phase
+        Which phase is being run
+    n_items: int
+        The number of items the phase will process
+    total: int
+        The total of the progress bar (n_items, capped at 100)
+    count: int
+        The number of items processed so far, set by the phase loop
+    interval: float
+        The time between reports in seconds
+
+    Methods
+    -------
+    ProgressReporter(queue: SimpleQueue, run: int, phase: Phase, n_items: int, interval: float = REPORT_INTERVAL)
+        Construct the reporter
+    start()
+        Start the reporting thread
+    stop()
+        Stop the reporting thread and send the remaining progress
+    """
+
+    def __init__(
+        self,
+        queue: SimpleQueue,
+        run: int,
+        phase: Phase,
+        n_items: int,
+        interval: float = REPORT_INTERVAL,
+    ):
+        self.queue = queue
+        self.run = run
+        self.phase = phase
+        self.n_items = n_items
+        self.total = min(n_items, 100)
+        self.count = 0
+        self.interval = interval
+        self.reported = 0
+        self.stop_event = Event()
+        self.thread = Thread(target=self._report_loop, daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Start the reporting thread"""
+        # Let the parent know which phase we are in right away
+        self.queue.put(StatusMessage(self.run, self.phase, self.total, 0))
+        self.thread.start()
+
+    def stop(self):
+        """Stop the reporting thread and send the remaining progress"""
+        self.stop_event.set()
+        self.thread.join()
+        self._report()
+
+    def _report_loop(self):
+        while not self.stop_event.wait(self.interval):
+            self._report()
+
+    def _report(self):
+        if self.n_items == 0:
+            return
+        progress = min(self.count, self.n_items) * self.total // self.n_items
+        if progress > self.reported:
+            self.queue.put(
+                StatusMessage(
+                    self.run, self.phase, self.total, progress - self.reported
+                )
+            )
+            self.reported = progress
@@ -1,12 +1,48 @@
 from .core.config import ClusterParameters
 from .core.point_cloud import PointCloud
 from .core.clusterize import form_clusters, join_clusters, cleanup_clusters
+from .core.cluster import Cluster
 from .core.workspace import Workspace
-from .parallel.status_message import StatusMessage, Phase
+from .core.event_store import (
+    EventStoreReader,
+    EventStoreWriter,
+    CLUSTER_FIELDS,
+    CHUNK_CACHE_BYTES,
+    CHUNK_CACHE_SLOTS,
+    CHUNK_CACHE_W0,
+)
+from .parallel.status_message import Phase
+from .parallel.progress_reporter import ProgressReporter
 from .core.spy_log import spyral_warn, spyral_error, spyral_info
 
 import h5py as h5
+import numpy as np
 from multiprocessing import SimpleQueue
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterator
+
+
+def cluster_cloud(cloud: PointCloud, params: ClusterParameters) -> list[Cluster]:
+    """Form, join, and clean up the clusters of a single point cloud
+
+    Module level so that it can be sent to worker processes.
+
+    Parameters
+    ----------
+    cloud: PointCloud
+        The point cloud to be clustered
+    params: ClusterParameters
+        Configuration parameters controlling the clustering algorithm
+
+    Returns
+    -------
+    list[Cluster]
+        The cleaned clusters of the event
+    """
+    clusters = form_clusters(cloud, params)
+    joined = join_clusters(clusters, params)
+    return cleanup_clusters(joined, params)
 
 
 def phase_cluster(
@@ -42,8 +78,20 @@ def phase_cluster(
 
     cluster_path = ws.get_cluster_file_path(run)
 
-    point_file = h5.File(point_path, "r")
-    cluster_file = h5.File(cluster_path, "w")
+    point_file = h5.File(
+        point_path,
+        "r",
+        rdcc_nbytes=CHUNK_CACHE_BYTES,
+        rdcc_nslots=CHUNK_CACHE_SLOTS,
+        rdcc_w0=CHUNK_CACHE_W0,
+    )
+    cluster_file = h5.File(
+        cluster_path,
+        "w",
+        rdcc_nbytes=CHUNK_CACHE_BYTES,
+        rdcc_nslots=CHUNK_CACHE_SLOTS,
+        rdcc_w0=CHUNK_CACHE_W0,
+    )
 
     cloud_group: h5.Group = point_file["cloud"]  # type: ignore
     if not isinstance(cloud_group, h5.Group):
@@ -55,57 +103,61 @@ def phase_cluster(
     cluster_group: h5.Group = cluster_file.create_group("cluster")
     cluster_group.attrs["min_event"] = min_event
     cluster_group.attrs["max_event"] = max_event
-
-    nevents = max_event - min_event
-    total: int
-    flush_val: int
-    if nevents < 1000:
-        total = nevents
-        flush_val = 0
-    else:
-        flush_percent = 0.01
-        flush_val = int(flush_percent * (max_event - min_event))
-        total = 100
-
-    count = 0
-
-    msg = StatusMessage(run, Phase.CLUSTER, total, 1)  # we always increment by 1
-
-    # Process the data
-    for idx in range(min_event, max_event + 1):
-        count += 1
-        if count > flush_val:
-            count = 0
-            queue.put(msg)
-
-        cloud_data: h5.Dataset | None = None
-        try:
-            cloud_data = cloud_group[f"cloud_{idx}"]  # type: ignore
-        except Exception:
-            continue
-
-        if cloud_data is None:
-            continue
-
-        cloud = PointCloud()
-        cloud.load_cloud_from_hdf5_data(cloud_data[:].copy(), idx)
-
-        clusters = form_clusters(cloud, cluster_params)
-        joined = join_clusters(clusters, cluster_params)
-        cleaned = cleanup_clusters(joined, cluster_params)
-
-        # Each event can contain many clusters
-        cluster_event_group = cluster_group.create_group(f"event_{idx}")
-        cluster_event_group.attrs["nclusters"] = len(cleaned)
-        cluster_event_group.attrs["ic_amplitude"] = cloud_data.attrs["ic_amplitude"]
-        cluster_event_group.attrs["ic_centroid"] = cloud_data.attrs["ic_centroid"]
-        cluster_event_group.attrs["ic_integral"] = cloud_data.attrs["ic_integral"]
-        cluster_event_group.attrs["ic_multiplicity"] = cloud_data.attrs[
-            "ic_multiplicity"
-        ]
-        for cidx, cluster in enumerate(cleaned):
-            local_group = cluster_event_group.create_group(f"cluster_{cidx}")
-            local_group.attrs["label"] = cluster.label
-            local_group.create_dataset("cloud", data=cluster.data)
+    # Clusters are staged and written in batches
+    cluster_store = EventStoreWriter(cluster_group, 5, CLUSTER_FIELDS)
+
+    # The per-event values are small and are loaded all at once
+    cloud_store = EventStoreReader(cloud_group)
+    events = cloud_store.fields["event"]
+    ic_amplitudes = cloud_store.fields["ic_amplitude"]
+    ic_centroids = cloud_store.fields["ic_centroid"]
+    ic_integrals = cloud_store.fields["ic_integral"]
+    ic_multiplicities = cloud_store.fields["ic_multiplicity"]
+
+    nevents = len(cloud_store)
+
+    # Clustering of each event is independent, so it can be farmed out to worker processes.
+    # Clouds are read and clusters are written only by this process.
+    executor: ProcessPoolExecutor | None = None
+    if cluster_params.n_workers > 1:
+        executor = ProcessPoolExecutor(max_workers=cluster_params.n_workers)
+    cluster_func = partial(cluster_cloud, params=cluster_params)
+
+    try:
+        # Process the data, the clouds are read from the file in batches
+        # Progress is sent to the parent from a background thread
+        with ProgressReporter(queue, run, Phase.CLUSTER, nevents) as progress:
+            for rows, batch in cloud_store.iter_batches():
+                clouds: list[PointCloud] = []
+                for row, cloud_data in zip(rows, batch):
+                    cloud = PointCloud()
+                    cloud.load_cloud_from_hdf5_data(cloud_data, int(events[row]))
+                    clouds.append(cloud)
+
+                results: Iterator[list[Cluster]]
+                if executor is None:
+                    results = map(cluster_func, clouds)
+                else:
+                    results = executor.map(cluster_func, clouds, chunksize=64)
+
+                for row, cleaned in zip(rows, results):
+                    progress.count = row + 1
+
+                    # Each event can contain many clusters, which are staged together
+                    cluster_store.extend(
+                        [cluster.data for cluster in cleaned],
+                        event=events[row],
+                        cluster_index=np.arange(len(cleaned)),
+                        label=[cluster.label for cluster in cleaned],
+                        ic_amplitude=ic_amplitudes[row],
+                        ic_integral=ic_integrals[row],
+                        ic_centroid=ic_centroids[row],
+                        ic_multiplicity=ic_multiplicities[row],
+                    )
+        # Write out anything left in the staging area
+        cluster_store.flush()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
 
     spyral_info(__name__, "Phase 2 complete.")
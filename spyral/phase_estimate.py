@@ -2,7 +2,14 @@ from .core.cluster import Cluster
 from .core.config import DetectorParameters, EstimateParameters
 from .core.estimator import estimate_physics
 from .core.workspace import Workspace
-from .parallel.status_message import StatusMessage, Phase
+from .core.event_store import (
+    EventStoreReader,
+    CHUNK_CACHE_BYTES,
+    CHUNK_CACHE_SLOTS,
+    CHUNK_CACHE_W0,
+)
+from .parallel.status_message import Phase
+from .parallel.progress_reporter import ProgressReporter
 from .core.spy_log import spyral_error, spyral_warn, spyral_info
 
 from polars import DataFrame
@@ -46,27 +53,29 @@ def phase_estimate(
 
     estimate_path = ws.get_estimate_file_path_parquet(run)
 
-    cluster_file = h5.File(cluster_path, "r")
+    cluster_file = h5.File(
+        cluster_path,
+        "r",
+        rdcc_nbytes=CHUNK_CACHE_BYTES,
+        rdcc_nslots=CHUNK_CACHE_SLOTS,
+        rdcc_w0=CHUNK_CACHE_W0,
+    )
     cluster_group: h5.Group = cluster_file["cluster"]  # type: ignore
     if not isinstance(cluster_group, h5.Group):
         spyral_error(__name__, f"Cluster group not present for run {run}!")
         return
 
-    min_event: int = cluster_group.attrs["min_event"]  # type: ignore
-    max_event: int = cluster_group.attrs["max_event"]  # type: ignore
+    # The per-cluster values are small and are loaded all at once
+    cluster_store = EventStoreReader(cluster_group)
+    events = cluster_store.fields["event"].tolist()
+    cluster_indices = cluster_store.fields["cluster_index"].tolist()
+    labels = cluster_store.fields["label"].tolist()
+    ic_amplitudes = cluster_store.fields["ic_amplitude"].tolist()
+    ic_centroids = cluster_store.fields["ic_centroid"].tolist()
+    ic_integrals = cluster_store.fields["ic_integral"].tolist()
+    ic_multiplicities = cluster_store.fields["ic_multiplicity"].tolist()
 
-    nevents = max_event - min_event
-    total: int
-    flush_val: int
-    if nevents < 1000:
-        total = nevents
-        flush_val = 0
-    else:
-        flush_percent = 0.01
-        flush_val = int(flush_percent * (max_event - min_event))
-        total = 100
-
-    count = 0
+    nclusters = len(cluster_store)
 
     # estimation results
     data: dict[str, list] = {
@@ -92,45 +101,22 @@ def phase_estimate(
         "direction": [],
     }
 
-    msg = StatusMessage(run, Phase.ESTIMATE, total, 1)  # We always increment by 1
-    # Process data
-    for idx in range(min_event, max_event + 1):
-        count += 1
-        if count > flush_val:
-            count = 0
-            queue.put(msg)
-
-        event: h5.Group | None = None
-        try:
-            event = cluster_group[f"event_{idx}"]  # type: ignore
-        except Exception:
-            continue
-
-        nclusters: int = event.attrs["nclusters"]  # type: ignore
-        ic_amp = float(event.attrs["ic_amplitude"])  # type: ignore
-        ic_cent = float(event.attrs["ic_centroid"])  # type: ignore
-        ic_int = float(event.attrs["ic_integral"])  # type: ignore
-        ic_mult = float(event.attrs["ic_multiplicity"])  # type: ignore
-        # Go through every cluster in each event
-        for cidx in range(0, nclusters):
-            local_cluster: h5.Group | None = None
-            try:
-                local_cluster = event[f"cluster_{cidx}"]  # type: ignore
-            except Exception:
-                continue
-
-            cluster = Cluster(
-                idx, local_cluster.attrs["label"], local_cluster["cloud"][:].copy()  # type: ignore
-            )
+    # Process data, the clusters are read from the file in batches
+    # Progress is sent to the parent from a background thread
+    with ProgressReporter(queue, run, Phase.ESTIMATE, nclusters) as progress:
+        for row, cluster_data in cluster_store.iter_entries():
+            progress.count = row + 1
+
+            cluster = Cluster(events[row], labels[row], cluster_data)
 
             # Cluster is loaded do some analysis
             estimate_physics(
-                cidx,
+                cluster_indices[row],
                 cluster,
-                ic_amp,
-                ic_cent,
-                ic_int,
-                ic_mult,
+                ic_amplitudes[row],
+                ic_centroids[row],
+                ic_integrals[row],
+                ic_multiplicities[row],
                 estimate_params,
                 detector_params,
                 data,
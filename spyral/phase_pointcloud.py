@@ -2,11 +2,20 @@ from .core.config import GetParameters, DetectorParameters, FribParameters
 from .core.pad_map import PadMap
 from .core.point_cloud import PointCloud
 from .core.workspace import Workspace
+from .core.file_advice import advise_sequential, advise_done, advise_will_need
+from .core.event_store import (
+    EventStoreWriter,
+    POINT_CLOUD_FIELDS,
+    CHUNK_CACHE_BYTES,
+    CHUNK_CACHE_SLOTS,
+    CHUNK_CACHE_W0,
+)
 from .trace.frib_event import FribEvent
 from .trace.get_event import GetEvent
 from .trace.frib_scalers import process_scalers
 from .correction import create_electron_corrector, ElectronCorrector
-from .parallel.status_message import StatusMessage, Phase
+from .parallel.status_message import Phase
+from .parallel.progress_reporter import ProgressReporter
 from .core.spy_log import spyral_info, spyral_error, spyral_warn
 
 import h5py as h5
@@ -79,7 +88,15 @@ def phase_pointcloud(
     # Open files
     point_path = ws.get_point_cloud_file_path(run)
     trace_file = h5.File(trace_path, "r")
-    point_file = h5.File(point_path, "w")
+    # The traces are read once, in event order
+    advise_sequential(trace_file)
+    point_file = h5.File(
+        point_path,
+        "w",
+        rdcc_nbytes=CHUNK_CACHE_BYTES,
+        rdcc_nslots=CHUNK_CACHE_SLOTS,
+        rdcc_w0=CHUNK_CACHE_W0,
+    )
 
     min_event, max_event = get_event_range(trace_file)
 
@@ -124,130 +141,148 @@ def phase_pointcloud(
     cloud_group = point_file.create_group("cloud")
     cloud_group.attrs["min_event"] = min_event
     cloud_group.attrs["max_event"] = max_event
+    # Point clouds are staged and written in batches
+    store = EventStoreWriter(cloud_group, 8, POINT_CLOUD_FIELDS)
 
-    nevents = max_event - min_event
-    total: int
-    flush_val: int
-    if nevents < 1000:
-        total = nevents
-        flush_val = 0
-    else:
-        flush_percent = 0.01
-        flush_val = int(flush_percent * (max_event - min_event))
-        total = 100
+    nevents = max_event - min_event + 1
 
-    count = 0
-    msg = StatusMessage(run, Phase.CLOUD, total, 1)  # We always increment by 1
+    # Gather the dataset names once, so missing events are found with a set lookup
+    event_names = set(event_group.keys())
+    frib_names = set(frib_evt_group.keys())
 
     # Process the data
-    for idx in range(min_event, max_event + 1):
-        count += 1
-        if count > flush_val:
-            count = 0
-            queue.put(msg)
+    # Progress is sent to the parent from a background thread
+    with ProgressReporter(queue, run, Phase.CLOUD, nevents) as progress:
+        for idx in range(min_event, max_event + 1):
+            progress.count = idx - min_event + 1
 
-        event_data: h5.Dataset
-        try:
-            event_data = event_group[f"evt{idx}_data"]  # type: ignore
-        except Exception:
-            continue
+            event_name = f"evt{idx}_data"
+            if event_name not in event_names:
+                continue
+            event_data: h5.Dataset = event_group[event_name]  # type: ignore
 
-        event = GetEvent(event_data, idx, get_params, rng)
+            # Start reading the next event from disk while this one is analyzed
+            next_name = f"evt{idx + 1}_data"
+            if next_name in event_names:
+                advise_will_need(event_group[next_name])  # type: ignore
 
-        pc = PointCloud()
-        pc.load_cloud_from_get_event(event, pad_map)
+            event = GetEvent(event_data, idx, get_params, rng)
 
-        pc_dataset = cloud_group.create_dataset(
-            f"cloud_{pc.event_number}", shape=pc.cloud.shape, dtype=np.float64
-        )
+            pc = PointCloud()
+            pc.load_cloud_from_get_event(event, pad_map)
 
-        # default IC settings
-        pc_dataset.attrs["ic_amplitude"] = -1.0
-        pc_dataset.attrs["ic_integral"] = -1.0
-        pc_dataset.attrs["ic_centroid"] = -1.0
-        pc_dataset.attrs["ic_multiplicity"] = -1.0
-
-        # Now analyze FRIBDAQ data
-        frib_data: h5.Dataset
-        try:
-            frib_data = frib_evt_group[f"evt{idx}_1903"]  # type: ignore
-        except Exception:
-            pc.calibrate_z_position(
-                detector_params.micromegas_time_bucket,
-                detector_params.window_time_bucket,
-                detector_params.detector_length,
-                corrector,
-            )
-            pc_dataset[:] = pc.cloud
-            continue
-
-        frib_event = FribEvent(frib_data, idx, frib_params)
-        # Handle IC analysis cases
-        # First check if IC correction is not on
-        if frib_params.correct_ic_time:
-            # IC correction is on, extract good IC peak with Si coincidence imposed
-            good_ic = frib_event.get_good_ic_peak(frib_params)
-            if good_ic is None:
-                # There is no good IC peak, skip
+            # default IC settings
+            ic_amplitude = -1.0
+            ic_integral = -1.0
+            ic_centroid = -1.0
+            ic_multiplicity = -1.0
+
+            # Now analyze FRIBDAQ data
+            frib_name = f"evt{idx}_1903"
+            if frib_name not in frib_names:
                 pc.calibrate_z_position(
                     detector_params.micromegas_time_bucket,
                     detector_params.window_time_bucket,
                     detector_params.detector_length,
                     corrector,
                 )
-                pc_dataset[:] = pc.cloud
+                store.append(
+                    pc.cloud,
+                    event=pc.event_number,
+                    ic_amplitude=ic_amplitude,
+                    ic_integral=ic_integral,
+                    ic_centroid=ic_centroid,
+                    ic_multiplicity=ic_multiplicity,
+                )
                 continue
-            # Good IC found, get the peak and multiplicity
-            peak = good_ic[1]
-            mult = good_ic[0]
-            pc_dataset.attrs["ic_amplitude"] = peak.amplitude
-            pc_dataset.attrs["ic_integral"] = peak.integral
-            pc_dataset.attrs["ic_centroid"] = peak.centroid
-            pc_dataset.attrs["ic_multiplicity"] = mult
-
-            ic_cor = frib_event.correct_ic_time(
-                peak, frib_params, detector_params.get_frequency
-            )
-            # Apply IC correction to time calibration, if correction is less than the
-            # total length of the GET window in TB
-            if ic_cor < 512.0:
-                pc.calibrate_z_position(
-                    detector_params.micromegas_time_bucket,
-                    detector_params.window_time_bucket,
-                    detector_params.detector_length,
-                    corrector,
-                    ic_cor,
+
+            frib_data: h5.Dataset = frib_evt_group[frib_name]  # type: ignore
+            frib_event = FribEvent(frib_data, idx, frib_params)
+            # Handle IC analysis cases
+            # First check if IC correction is not on
+            if frib_params.correct_ic_time:
+                # IC correction is on, extract good IC peak with Si coincidence imposed
+                good_ic = frib_event.get_good_ic_peak(frib_params)
+                if good_ic is None:
+                    # There is no good IC peak, skip
+                    pc.calibrate_z_position(
+                        detector_params.micromegas_time_bucket,
+                        detector_params.window_time_bucket,
+                        detector_params.detector_length,
+                        corrector,
+                    )
+                    store.append(
+                        pc.cloud,
+                        event=pc.event_number,
+                        ic_amplitude=ic_amplitude,
+                        ic_integral=ic_integral,
+                        ic_centroid=ic_centroid,
+                        ic_multiplicity=ic_multiplicity,
+                    )
+                    continue
+                # Good IC found, get the peak and multiplicity
+                peak = good_ic[1]
+                mult = good_ic[0]
+                ic_amplitude = peak.amplitude
+                ic_integral = peak.integral
+                ic_centroid = peak.centroid
+                ic_multiplicity = mult
+
+                ic_cor = frib_event.correct_ic_time(
+                    peak, frib_params, detector_params.get_frequency
                 )
+                # Apply IC correction to time calibration, if correction is less than the
+                # total length of the GET window in TB
+                if ic_cor < 512.0:
+                    pc.calibrate_z_position(
+                        detector_params.micromegas_time_bucket,
+                        detector_params.window_time_bucket,
+                        detector_params.detector_length,
+                        corrector,
+                        ic_cor,
+                    )
+                else:
+                    pc.calibrate_z_position(
+                        detector_params.micromegas_time_bucket,
+                        detector_params.window_time_bucket,
+                        detector_params.detector_length,
+                        corrector,
+                    )
             else:
+                # No IC correction, so we calibrate z without it
                 pc.calibrate_z_position(
                     detector_params.micromegas_time_bucket,
                     detector_params.window_time_bucket,
                     detector_params.detector_length,
                     corrector,
                 )
-        else:
-            # No IC correction, so we calibrate z without it
-            pc.calibrate_z_position(
-                detector_params.micromegas_time_bucket,
-                detector_params.window_time_bucket,
-                detector_params.detector_length,
-                corrector,
+                # Get triggering IC, no Si conicidence imposed
+                ic_mult = frib_event.get_ic_multiplicity(frib_params)
+                ic_peak = frib_event.get_triggering_ic_peak(frib_params)
+                # Check multiplicity condition and existence of trigger
+                if ic_mult <= frib_params.ic_multiplicity and ic_peak is not None:
+                    ic_amplitude = ic_peak.amplitude
+                    ic_integral = ic_peak.integral
+                    ic_centroid = ic_peak.centroid
+                    ic_multiplicity = ic_mult
+
+            store.append(
+                pc.cloud,
+                event=pc.event_number,
+                ic_amplitude=ic_amplitude,
+                ic_integral=ic_integral,
+                ic_centroid=ic_centroid,
+                ic_multiplicity=ic_multiplicity,
             )
-            # Get triggering IC, no Si conicidence imposed
-            ic_mult = frib_event.get_ic_multiplicity(frib_params)
-            ic_peak = frib_event.get_triggering_ic_peak(frib_params)
-            # Check multiplicity condition and existence of trigger
-            if ic_mult <= frib_params.ic_multiplicity and ic_peak is not None:
-                pc_dataset.attrs["ic_amplitude"] = ic_peak.amplitude
-                pc_dataset.attrs["ic_integral"] = ic_peak.integral
-                pc_dataset.attrs["ic_centroid"] = ic_peak.centroid
-                pc_dataset.attrs["ic_multiplicity"] = ic_mult
-
-        pc_dataset[:] = pc.cloud
     # End of event data
+    # Write out anything left in the staging area
+    store.flush()
 
     # Process scaler data if it exists
     if frib_scaler_group is not None:
         process_scalers(frib_scaler_group, ws.get_scaler_file_path(run))
 
+    # The traces will not be read again, free the page cache for the point clouds
+    advise_done(trace_file)
+
     spyral_info(__name__, "Phase 1 complete")
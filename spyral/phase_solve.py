@@ -1,10 +1,18 @@
 from .core.config import SolverParameters, DetectorParameters
 from .interpolate.track_interpolator import create_interpolator
 from .core.workspace import Workspace
+from .core.event_store import (
+    EventStoreReader,
+    CHUNK_CACHE_BYTES,
+    CHUNK_CACHE_SLOTS,
+    CHUNK_CACHE_W0,
+)
 from .core.cluster import Cluster
 from .core.estimator import Direction
 from .solvers.solver_interp import solve_physics_interp, Guess
+from .geometry.polygon import points_in_polygon
 from .parallel.status_message import StatusMessage, Phase
+from .parallel.progress_reporter import ProgressReporter
 from .core.spy_log import spyral_error, spyral_warn, spyral_info
 
 from spyral_utils.nuclear import NuclearDataMap
@@ -13,6 +21,7 @@ from spyral_utils.nuclear.particle_id import deserialize_particle_id, ParticleID
 
 import h5py as h5
 import polars as pl
+import numpy as np
 from multiprocessing import SimpleQueue
 from pathlib import Path
 
@@ -80,7 +89,13 @@ def phase_solve(
 
     # Setup files
     result_path = ws.get_physics_file_path_parquet(run, pid.nucleus)
-    cluster_file = h5.File(cluster_path, "r")
+    cluster_file = h5.File(
+        cluster_path,
+        "r",
+        rdcc_nbytes=CHUNK_CACHE_BYTES,
+        rdcc_nslots=CHUNK_CACHE_SLOTS,
+        rdcc_w0=CHUNK_CACHE_W0,
+    )
     estimate_df = pl.scan_parquet(estimate_path)
 
     cluster_group: h5.Group = cluster_file["cluster"]  # type: ignore
@@ -90,100 +105,142 @@ def phase_solve(
         )
         return
 
-    # Select the particle group data, beam region of ic, convert to dictionary for row-wise operations
+    # Select the beam region of ic, then the particle group data
+    # The query contains only native expressions, so it is run with the streaming engine and only the
+    # columns used by the solver are read. The particle group is then tested on the numpy columns directly
     # Select only the largest polar angle for a given event to avoid beam-like particles
-    estimates_gated = (
+    # Sort by event so that the cluster file is read in order
+    estimates_ic = (
         estimate_df.filter(
-            pl.struct(["dEdx", "brho"]).map_batches(pid.cut.is_cols_inside)
-            & (pl.col("ic_amplitude") > solver_params.ic_min_val)
+            (pl.col("ic_amplitude") > solver_params.ic_min_val)
             & (pl.col("ic_amplitude") < solver_params.ic_max_val)
         )
+        .select(
+            "event",
+            "cluster_index",
+            "dEdx",
+            "brho",
+            "polar",
+            "azimuthal",
+            "vertex_x",
+            "vertex_y",
+            "vertex_z",
+        )
+        .collect(engine="streaming")
+    )
+    pid_mask = points_in_polygon(
+        estimates_ic["dEdx"].to_numpy(),
+        estimates_ic["brho"].to_numpy(),
+        np.array(pid.cut.get_vertices(), dtype=float),
+    )
+    estimates_gated = (
+        estimates_ic.filter(pl.Series(pid_mask))
         .sort("polar", descending=True)
         .unique("event", keep="first")
-        .collect()
-        .to_dict()
+        .sort("event")
     )
 
     # Check that data actually exists for given PID
-    if len(estimates_gated["event"]) == 0:
+    if len(estimates_gated) == 0:
         queue.put(StatusMessage(run, Phase.WAIT, 0, 0))
         spyral_warn(__name__, f"No events within PID for run {run}!")
         return
 
-    nevents = len(estimates_gated["event"])
-    total: int
-    flush_val: int
-    if nevents < 1000:
-        total = nevents
-        flush_val = 0
-    else:
-        flush_percent = 0.01
-        flush_val = int(flush_percent * (nevents))
-        total = 100
-
-    count = 0
-
-    msg = StatusMessage(run, Phase.SOLVE, total, 1)  # We always increment by 1
-
-    # Result storage
-    results: dict[str, list] = {
-        "event": [],
-        "cluster_index": [],
-        "cluster_label": [],
-        "vertex_x": [],
-        "sigma_vx": [],
-        "vertex_y": [],
-        "sigma_vy": [],
-        "vertex_z": [],
-        "sigma_vz": [],
-        "brho": [],
-        "sigma_brho": [],
-        "polar": [],
-        "sigma_polar": [],
-        "azimuthal": [],
-        "sigma_azimuthal": [],
-        "redchisq": [],
+    # Extract the columns once as contiguous arrays for row-wise operations
+    events = estimates_gated["event"].to_numpy()
+    cluster_indices = estimates_gated["cluster_index"].to_numpy()
+    polar = estimates_gated["polar"].to_numpy()
+    azimuthal = estimates_gated["azimuthal"].to_numpy()
+    brho = estimates_gated["brho"].to_numpy()
+    vertex_x = estimates_gated["vertex_x"].to_numpy()
+    vertex_y = estimates_gated["vertex_y"].to_numpy()
+    vertex_z = estimates_gated["vertex_z"].to_numpy()
+
+    nevents = len(events)
+
+    # Result storage, one row per selected cluster
+    # Rows of clusters which were not fit are marked in fitted and dropped when written
+    int_columns = ["event", "cluster_index", "cluster_label"]
+    float_columns = [
+        "vertex_x",
+        "sigma_vx",
+        "vertex_y",
+        "sigma_vy",
+        "vertex_z",
+        "sigma_vz",
+        "brho",
+        "sigma_brho",
+        "polar",
+        "sigma_polar",
+        "azimuthal",
+        "sigma_azimuthal",
+        "redchisq",
+    ]
+    results: dict[str, np.ndarray] = {
+        column: np.empty(nevents, dtype=np.int64) for column in int_columns
     }
+    results.update({column: np.empty(nevents, dtype=float) for column in float_columns})
+    fitted = np.zeros(nevents, dtype=bool)
 
     # load the ODE solution interpolator
     interp_path = ws.get_track_file_path(pid.nucleus, target)
     interpolator = create_interpolator(interp_path)
 
-    # Process the data
-    for row, event in enumerate(estimates_gated["event"]):
-        count += 1
-        if count > flush_val:
-            count = 0
-            queue.put(msg)
-
-        event_group = cluster_group[f"event_{event}"]
-        cidx = estimates_gated["cluster_index"][row]
-        local_cluster: h5.Dataset = event_group[f"cluster_{cidx}"]  # type: ignore
-        cluster = Cluster(
-            event, local_cluster.attrs["label"], local_cluster["cloud"][:].copy()  # type: ignore
-        )
+    # The per-cluster values are small and are loaded all at once
+    # Clusters are stored in event order, with the clusters of an event contiguous,
+    # so the entries of all of the selected clusters are found up front in one pass
+    cluster_store = EventStoreReader(cluster_group)
+    cluster_rows = (
+        np.searchsorted(cluster_store.fields["event"], events) + cluster_indices
+    )
+    cluster_labels = cluster_store.fields["label"][cluster_rows]
 
-        # Do the solver
-        guess = Guess(
-            estimates_gated["polar"][row],
-            estimates_gated["azimuthal"][row],
-            estimates_gated["brho"][row],
-            estimates_gated["vertex_x"][row],
-            estimates_gated["vertex_y"][row],
-            estimates_gated["vertex_z"][row],
-            Direction.NONE,
-        )
-        solve_physics_interp(
-            cidx,
-            cluster,
-            guess,
-            pid.nucleus,
-            interpolator,
-            det_params,
-            results,
+    # Clouds are read into a reusable buffer, sized for the largest selected cluster
+    buffer = np.empty(
+        (
+            cluster_store.fields["length"][cluster_rows].max(),
+            cluster_store.data.shape[1],
         )
+    )
+
+    # Process the data
+    # Progress is sent to the parent from a background thread
+    with ProgressReporter(queue, run, Phase.SOLVE, nevents) as progress:
+        for row, event in enumerate(events.tolist()):
+            progress.count = row + 1
+
+            cidx = int(cluster_indices[row])
+            # The solver does not modify the cluster data, so a view of the buffer is safe
+            cluster = Cluster(
+                event,
+                int(cluster_labels[row]),
+                cluster_store.read_into(cluster_rows[row], buffer),
+            )
+
+            # Do the solver
+            guess = Guess(
+                polar[row],
+                azimuthal[row],
+                brho[row],
+                vertex_x[row],
+                vertex_y[row],
+                vertex_z[row],
+                Direction.NONE,
+            )
+            fitted[row] = solve_physics_interp(
+                cidx,
+                cluster,
+                guess,
+                pid.nucleus,
+                interpolator,
+                det_params,
+                results,
+                row,
+            )
 
     # Write out the results
-    physics_df = pl.DataFrame(results)
+    physics_df = pl.DataFrame(
+        {column: values[fitted] for column, values in results.items()}
+    )
     physics_df.write_parquet(result_path)
     spyral_info(__name__, "Phase 4 complete.")
@@ -10,7 +10,7 @@ from spyral_utils.nuclear import NucleusData
 from lmfit import Parameters, minimize, fit_report
 from lmfit.minimizer import MinimizerResult
 import numpy as np
-from numba import njit, prange
+from numba import njit
 
 
 @njit(fastmath=True, error_model="numpy", inline="always")
@@ -18,7 +18,8 @@ def distances(track: np.ndarray, data: np.ndarray) -> float:
     """Calculate the average distance (error) of a track solution to the data
 
     Loop over the data and approximate the error as the closest distance of a point in the
-    track solution to the data. JIT-ed for speed
+    track solution to the data. The closest distance is tracked as a running minimum so that
+    no distance matrix is allocated. JIT-ed for speed
 
     Parameters
     ----------
@@ -35,19 +36,83 @@ def distances(track: np.ndarray, data: np.ndarray) -> float:
     assert track.shape[1] == 3
     assert data.shape[1] == 3
 
-    dists = np.zeros((len(data), len(track)))
     error = 0.0
-    for i in prange(len(data)):
-        for j in prange(len(track)):
-            dists[i, j] = np.sqrt(
+    for i in range(len(data)):
+        # Start from the first point so that a NaN (out of range) track gives a NaN error
+        min_dist2 = (
+            (track[0, 0] - data[i, 0]) ** 2.0
+            + (track[0, 1] - data[i, 1]) ** 2.0
+            + (track[0, 2] - data[i, 2]) ** 2.0
+        )
+        for j in range(1, len(track)):
+            dist2 = (
                 (track[j, 0] - data[i, 0]) ** 2.0
                 + (track[j, 1] - data[i, 1]) ** 2.0
                 + (track[j, 2] - data[i, 2]) ** 2.0
             )
-        error += np.min(dists[i])
+            if dist2 < min_dist2:
+                min_dist2 = dist2
+        error += np.sqrt(min_dist2)
     return error / len(data)
 
 
+@njit
+def trajectory_error(
+    interpolator: TrackInterpolator,
+    data: np.ndarray,
+    vertex_x: float,
+    vertex_y: float,
+    vertex_z: float,
+    brho: float,
+    polar: float,
+    azimuthal: float,
+    charge: float,
+    mass: float,
+) -> float:
+    """Generate a trajectory and calculate its average distance (error) to the data
+
+    The objective function is evaluated many times per fit, so the trajectory generation and
+    the error calculation are done in a single JIT-ed call from plain floats. This avoids
+    returning the trajectory to Python and dispatching to numba twice per evaluation.
+
+    Parameters
+    ----------
+    interpolator: TrackInterpolator
+        the interpolation scheme to be used
+    data: ndarray
+        the data to be fit (x,y,z) coordinates in meters
+    vertex_x: float
+        the vertex x-coordinate in meters
+    vertex_y: float
+        the vertex y-coordinate in meters
+    vertex_z: float
+        the vertex z-coordinate in meters
+    brho: float
+        the magnetic rigidity in Tm
+    polar: float
+        the polar angle in radians
+    azimuthal: float
+        the azimuthal angle in radians
+    charge: float
+        the charge state (Z) of the particle being tracked
+    mass: float
+        the mass of the particle being tracked in MeV
+
+    Returns
+    -------
+    float
+        the error between the trajectory and the data, or 1.0e6 if the trajectory could not be generated
+    """
+    momentum = QBRHO_2_P * (brho * charge)
+    kinetic_energy = np.sqrt(momentum**2.0 + mass**2.0) - mass
+    trajectory = interpolator.get_trajectory(
+        vertex_x, vertex_y, vertex_z, polar, azimuthal, kinetic_energy
+    )
+    if trajectory is None:
+        return 1.0e6
+    return distances(trajectory, data)
+
+
 def interpolate_trajectory(
     fit_params: Parameters, interpolator: TrackInterpolator, ejectile: NucleusData
 ) -> np.ndarray | None:
@@ -109,10 +174,19 @@ def objective_function(
     float
         the error between the estimate and the data
     """
-    trajectory = interpolate_trajectory(fit_params, interpolator, ejectile)
-    if trajectory is None:
-        return 1.0e6
-    return distances(trajectory, x)
+    values = fit_params.valuesdict()
+    return trajectory_error(
+        interpolator,
+        x,
+        values["vertex_x"],
+        values["vertex_y"],
+        values["vertex_z"],
+        values["brho"],
+        values["polar"],
+        values["azimuthal"],
+        float(ejectile.Z),
+        ejectile.mass,
+    )
 
 
 def create_params(
@@ -259,11 +333,13 @@ def solve_physics_interp(
     ejectile: NucleusData,
     interpolator: TrackInterpolator,
     det_params: DetectorParameters,
-    results: dict[str, list],
-):
+    results: dict[str, np.ndarray],
+    row: int,
+) -> bool:
     """High level function to be called from the application.
 
-    Takes the Cluster and fits a trajectory to it using the initial Guess. It then writes the results to the dictionary.
+    Takes the Cluster and fits a trajectory to it using the initial Guess. It then writes the results to the
+    given row of the result arrays.
 
     Parameters
     ----------
@@ -279,14 +355,23 @@ def solve_physics_interp(
         the interpolation scheme to be used
     det_params: DetectorParameters
         Configuration parameters for detector characteristics
-    results: dict[str, list]
+    results: dict[str, ndarray]
         storage for results from the fitting, which will later be written as a dataframe.
+        Each array must have at least row + 1 elements
+    row: int
+        The row of the result arrays to write to
+
+    Returns
+    -------
+    bool
+        True if the fit was performed and the results written, False if the guess was outside of the interpolation
+        range
     """
     traj_data = cluster.data[:, :3] * 0.001
     momentum = QBRHO_2_P * (guess.brho * float(ejectile.Z))
     kinetic_energy = np.sqrt(momentum**2.0 + ejectile.mass**2.0) - ejectile.mass
     if not interpolator.check_values_in_range(kinetic_energy, guess.polar):
-        return
+        return False
 
     fit_params = create_params(guess, ejectile, interpolator, det_params)
 
@@ -297,22 +382,23 @@ def solve_physics_interp(
         method="lbfgsb",
     )
 
-    results["event"].append(cluster.event)
-    results["cluster_index"].append(cluster_index)
-    results["cluster_label"].append(cluster.label)
+    results["event"][row] = cluster.event
+    results["cluster_index"][row] = cluster_index
+    results["cluster_label"][row] = cluster.label
     # Best fit values and uncertainties
-    results["vertex_x"].append(best_fit.params["vertex_x"].value)  # type: ignore
-    results["vertex_y"].append(best_fit.params["vertex_y"].value)  # type: ignore
-    results["vertex_z"].append(best_fit.params["vertex_z"].value)  # type: ignore
-    results["brho"].append(best_fit.params["brho"].value)  # type: ignore
-    results["polar"].append(best_fit.params["polar"].value)  # type: ignore
-    results["azimuthal"].append(best_fit.params["azimuthal"].value)  # type: ignore
-    results["redchisq"].append(best_fit.redchi)
+    results["vertex_x"][row] = best_fit.params["vertex_x"].value  # type: ignore
+    results["vertex_y"][row] = best_fit.params["vertex_y"].value  # type: ignore
+    results["vertex_z"][row] = best_fit.params["vertex_z"].value  # type: ignore
+    results["brho"][row] = best_fit.params["brho"].value  # type: ignore
+    results["polar"][row] = best_fit.params["polar"].value  # type: ignore
+    results["azimuthal"][row] = best_fit.params["azimuthal"].value  # type: ignore
+    results["redchisq"][row] = best_fit.redchi
 
     # Right now we can't quantify uncertainties
-    results["sigma_vx"].append(1.0e6)
-    results["sigma_vy"].append(1.0e6)
-    results["sigma_vz"].append(1.0e6)
-    results["sigma_brho"].append(1.0e6)
-    results["sigma_polar"].append(1.0e6)
-    results["sigma_azimuthal"].append(1.0e6)
+    results["sigma_vx"][row] = 1.0e6
+    results["sigma_vy"][row] = 1.0e6
+    results["sigma_vz"][row] = 1.0e6
+    results["sigma_brho"][row] = 1.0e6
+    results["sigma_polar"][row] = 1.0e6
+    results["sigma_azimuthal"][row] = 1.0e6
+    return True
@@ -64,9 +64,8 @@ class FribEvent:
         """
         self.event_number = event_number
         self.event_name = str(raw_data.name)
-        trace_data = preprocess_frib_traces(
-            raw_data[:].copy(), params.baseline_window_scale
-        )
+        # The read returns a new array which the preprocessing may modify, no copy needed
+        trace_data = preprocess_frib_traces(raw_data[()], params.baseline_window_scale)
         self.traces = [FribTrace(column, params) for column in trace_data.T]
 
     def get_ic_trace(self) -> FribTrace:
@@ -88,13 +88,16 @@ class GetEvent:
         """
         self.name = str(raw_data.name)
         self.number = event_number
+        # Read the whole dataset once; the read returns a new array, so it is safe
+        # for the preprocessing to modify it and no copy is needed
+        event_data: np.ndarray = raw_data[()]
         trace_matrix = preprocess_traces(
-            raw_data[:, GET_DATA_TRACE_START:GET_DATA_TRACE_STOP].copy(),
+            event_data[:, GET_DATA_TRACE_START:GET_DATA_TRACE_STOP],
             params.baseline_window_scale,
         )
         self.traces = [
             GetTrace(trace_matrix[idx], hardware_id_from_array(row[0:5]), params, rng)
-            for idx, row in enumerate(raw_data)
+            for idx, row in enumerate(event_data)
         ]
 
     def is_valid(self) -> bool: